@@ -1,6 +1,7 @@
 import argparse
 import json
 import logging
+import math
 import os
 import sys
 import warnings
@@ -17,12 +18,23 @@ import traceback
 from models.audio.google_asr import GoogleASRModel
 from models.audio.openai_whisper_offline import OpenaiWhisperModelOffline
 from models.audio.openai_whisper_online import OpenaiWhisperModelOnline
+from models.model_manager import ModelManager
 from models.text.ollama_offline import LanguageDetectionOllamaAPI
+from watcher import (
+    DEFAULT_POLL_INTERVAL_SECONDS,
+    FileProcessingError,
+    FolderWatcher,
+)
 
 TEXT_LIMIT = 10
 AUDIO_LIMIT = 5
 
-audio_model = None
+# Estimated resident memory per backend in MB, used by the model manager
+# until a loaded torch model reports its real parameter size.
+WHISPER_OFFLINE_MB = 3000  # Whisper medium, fp32
+CLIENT_MB = 50  # API clients; the model itself runs remotely
+
+model_manager = ModelManager.from_config()
 
 
 warnings.filterwarnings("ignore", category=UserWarning)
@@ -37,12 +49,14 @@ logging.basicConfig(
 # Supported models
 TEXT_MODELS = ["gpt3.5", "gpt4", "llama2"]
 AUDIO_MODELS = ["google_asr", "whisper"]
+AUDIO_EXTENSIONS = (".wav", ".mp3")
+TEXT_EXTENSIONS = (".txt",)
 
 doc = """
 Language Detection Tool
 
 Usage:
-  main.py --data-type <type> --data-path <path> --model <model> --mode <mode>
+  main.py --data-type <type> --data-path <path> --model <model> --mode <mode> [--watch] [--poll-interval=<seconds>]
 
 Arguments:
   --data-type: Specify 'text' or 'audio'.
@@ -51,15 +65,36 @@ Arguments:
     Text: {text_models}
     Audio: {audio_models}
   --mode: Specify the mode, 'offline' or 'online'
+  --watch: Keep polling the data path and process only new or changed files.
+  --poll-interval: Seconds between polls in watch mode (default {poll_interval}).
 """.format(
-    text_models=", ".join(TEXT_MODELS), audio_models=", ".join(AUDIO_MODELS)
+    text_models=", ".join(TEXT_MODELS),
+    audio_models=", ".join(AUDIO_MODELS),
+    poll_interval=DEFAULT_POLL_INTERVAL_SECONDS,
 )
 
 
+def register_models(manager):
+    manager.register("google_asr", GoogleASRModel, CLIENT_MB)
+    manager.register(
+        "whisper_online",
+        lambda: OpenaiWhisperModelOnline(os.environ.get("OPENAI_API_KEY")),
+        CLIENT_MB,
+    )
+    manager.register(
+        "whisper_offline", OpenaiWhisperModelOffline, WHISPER_OFFLINE_MB
+    )
+    manager.register("llama2", LanguageDetectionOllamaAPI, CLIENT_MB)
+
+
+register_models(model_manager)
+
+
 def detect_google_asr(audio_path, mode):
     try:
         if mode == "online":
-            return audio_model.process_audio_file(audio_path)
+            with model_manager.use("google_asr") as audio_model:
+                return audio_model.process_audio_file(audio_path)
     except Exception as e:
         logging.error(f"Error in detect_google_asr: {e}")
         return None
@@ -68,10 +103,11 @@ def detect_google_asr(audio_path, mode):
 def detect_openai_whisper(audio_path, mode):
     try:
         if mode == "offline":
-            whisper_model = OpenaiWhisperModelOffline()
-            return whisper_model.process_audio_file(audio_path)
+            with model_manager.use("whisper_offline") as audio_model:
+                return audio_model.process_audio_file(audio_path)
         elif mode == "online":
-            return audio_model.process_audio_file(audio_path)
+            with model_manager.use("whisper_online") as audio_model:
+                return audio_model.process_audio_file(audio_path)
         else:
             logging.warning(f"Unsupported Whisper model type: {mode}")
             return None
@@ -92,8 +128,8 @@ def detect_gpt4_language(text):
 
 def detect_llama2_language(text):
     try:
-        api_instance = LanguageDetectionOllamaAPI()
-        result = api_instance.detect_language(text)
+        with model_manager.use("llama2") as text_model:
+            result = text_model.detect_language(text)
         if result is not None:
             return result
         else:
@@ -108,19 +144,14 @@ def detect_llama2_language(text):
 
 
 def detect_audio_language(audio_path, model, mode):
-    global audio_model
-    if audio_model is None:
-        audio_model_functions = {
-            "google_asr": detect_google_asr,
-            "whisper": detect_openai_whisper,
-        }
-
-        audio_model = audio_model_functions.get(model)
+    audio_model_functions = {
+        "google_asr": detect_google_asr,
+        "whisper": detect_openai_whisper,
+    }
 
-    model_function = audio_model
+    model_function = audio_model_functions.get(model)
     if model_function:
-        result = model_function.process_audio_file(audio_path)
-        return result
+        return model_function(audio_path, mode)
     else:
         logging.warning(f"Unsupported audio model: {model}")
         return None
@@ -143,14 +174,10 @@ def detect_text_language(text, model):
 
 
 def process_audio_directory(directory_path, model, mode):
-    global audio_model
-    if audio_model is None:
-        logging.error("Audio model is not defined.")
-        return
     processed_files = 0
 
     for filename in os.listdir(directory_path):
-        if filename.endswith(".wav") or filename.endswith(".mp3"):
+        if filename.endswith(AUDIO_EXTENSIONS):
             audio_path = os.path.join(directory_path, filename)
             detected_lang = detect_audio_language(audio_path, model, mode)
             if detected_lang:
@@ -163,21 +190,27 @@ def process_audio_directory(directory_path, model, mode):
             processed_files += 1
 
 
-def process_text_file(file_path, text_model, limit=None):
+def process_text_file(
+    file_path, text_model, limit=None, on_result=None, line_filter=None
+):
     try:
         with open(file_path, "r", encoding="utf-8") as file:
             lines_processed = 0
-            for line in file:
+            for line_number, line in enumerate(file, start=1):
                 line = line.strip()
+                if line_filter is not None and not line_filter(line_number):
+                    continue
                 if line:
                     detected_lang = detect_text_language(line, text_model)
+                    text = line.strip('"').strip("'").strip(",")
                     if detected_lang:
-                        text = line.strip('"').strip("'").strip(",")
                         print(f"{text}, {detected_lang}")
                     else:
                         logging.error(
                             f"Language detection failed using text model: {text_model}"
                         )
+                    if on_result is not None:
+                        on_result(line_number, text, detected_lang)
                     lines_processed += 1
 
                     if limit is not None and lines_processed >= limit:
@@ -188,6 +221,9 @@ def process_text_file(file_path, text_model, limit=None):
 
     except Exception as e:
         logging.error(f"Error reading file {file_path}: {e}")
+        if on_result is not None:
+            # Watch mode records the failure and retries the unread part.
+            raise
 
 
 def print_audio_summary(directory_path, audio_models, mode):
@@ -195,7 +231,7 @@ def print_audio_summary(directory_path, audio_models, mode):
     print(header)
 
     for filename in os.listdir(directory_path):
-        if filename.endswith(".wav") or filename.endswith(".mp3"):
+        if filename.endswith(AUDIO_EXTENSIONS):
             audio_path = os.path.join(directory_path, filename)
             detected_languages = [
                 detect_audio_language(audio_path, model, mode)
@@ -226,6 +262,87 @@ def print_summary(data_path, models, data_type, mode):
         print_text_summary(text_data, models)
 
 
+def watch_data_path(data_path, data_type, model, mode, poll_interval):
+    def process_audio(file_path, retry_state=None):
+        detected_lang = detect_audio_language(file_path, model, mode)
+        if not detected_lang or "error" in detected_lang:
+            raise FileProcessingError(
+                f"Unable to detect language using audio model: {model}"
+            )
+        return [{"model": model, **detected_lang}]
+
+    def process_text(file_path, retry_state=None):
+        # retry_state: {"lines": [failed line numbers], "resume_from": first
+        # unread line number or None}. Only those lines are redone.
+        results = []
+        failed_lines = []
+        last_done = 0
+
+        def line_filter(line_number):
+            nonlocal last_done
+            if retry_state is None:
+                return True
+            resume_from = retry_state["resume_from"]
+            if line_number in retry_state["lines"] or (
+                resume_from is not None and line_number >= resume_from
+            ):
+                return True
+            last_done = line_number
+            return False
+
+        def on_result(line_number, text, lang):
+            nonlocal last_done
+            last_done = line_number
+            if lang in (None, LanguageDetectionOllamaAPI.ERROR_MESSAGE):
+                failed_lines.append(line_number)
+            else:
+                results.append(
+                    {
+                        "model": model,
+                        "line": line_number,
+                        "text": text,
+                        "detected_lang": lang,
+                    }
+                )
+
+        resume_from = None
+        error = None
+        try:
+            process_text_file(
+                file_path, model, on_result=on_result, line_filter=line_filter
+            )
+        except (OSError, ValueError) as e:
+            resume_from = last_done + 1
+            error = f"Error reading from line {resume_from}: {e}"
+
+        if failed_lines:
+            message = (
+                f"Language detection failed for lines {failed_lines} "
+                f"using text model: {model}"
+            )
+            error = f"{message}. {error}" if error else message
+        if error:
+            raise FileProcessingError(
+                error,
+                results=results,
+                retry_state={"lines": failed_lines, "resume_from": resume_from},
+            )
+        return results
+
+    if data_type == "audio":
+        extensions, process_file = AUDIO_EXTENSIONS, process_audio
+    else:
+        extensions, process_file = TEXT_EXTENSIONS, process_text
+
+    watcher = FolderWatcher(
+        data_path,
+        extensions,
+        process_file,
+        poll_interval=poll_interval,
+    )
+    watcher.run()
+
+
 def main():
     # print(f"IN main...")
     args = docopt(doc)
@@ -233,10 +350,16 @@ def main():
     data_path = args["<path>"].strip()
     model = args["<model>"]
     mode = args["<mode>"]
-
-    global audio_model
-
-    audio_model = None
+    watch = args["--watch"]
+    try:
+        poll_interval = float(
+            args["--poll-interval"] or DEFAULT_POLL_INTERVAL_SECONDS
+        )
+    except ValueError:
+        poll_interval = None
+    if poll_interval is None or not math.isfinite(poll_interval) or poll_interval <= 0:
+        print("Invalid poll interval. Use a positive number of seconds.")
+        exit(1)
 
     print(f"\n", "." * 100)
     print(
@@ -253,7 +376,12 @@ def main():
                 exit(1)
             if model == "llama2" and mode == "offline":
                 if os.path.exists(data_path):
-                    process_text_file(data_path, model, limit=TEXT_LIMIT)
+                    if watch:
+                        watch_data_path(
+                            data_path, data_type, model, mode, poll_interval
+                        )
+                    else:
+                        process_text_file(data_path, model, limit=TEXT_LIMIT)
         else:
             print(f"Invalid text model. Choose from {', '.join(TEXT_MODELS)}.")
     elif data_type == "audio":
@@ -275,8 +403,8 @@ def main():
                         f"The file specified in GOOGLE_APPLICATION_CREDENTIALS is not a valid JSON file. Aborting execution."
                     )
 
-                # audio_model = OpenaiWhisperModelOnline(api_key)
-                audio_model = GoogleASRModel()
+                # Load up front so the first file doesn't pay the load time.
+                model_manager.get("google_asr")
             elif model == "google_asr" and mode == "offline":
                 print(
                     f"Google ASR is not available in offline mode. Aborting execution."
@@ -289,12 +417,16 @@ def main():
                     raise ValueError(
                         "OPENAI_API_KEY environment variable is not set."
                     )
-                audio_model = OpenaiWhisperModelOnline(api_key)
+                model_manager.get("whisper_online")
             elif model == "whisper" and mode == "offline":
-                audio_model = OpenaiWhisperModelOffline()
+                model_manager.get("whisper_offline")
 
             if os.path.exists(data_path):
-                if os.path.isdir(data_path):
+                if watch:
+                    watch_data_path(
+                        data_path, data_type, model, mode, poll_interval
+                    )
+                elif os.path.isdir(data_path):
                     process_audio_directory(data_path, model, mode)
                 else:
                     detected_lang = detect_audio_language(
@@ -316,6 +448,8 @@ def main():
     else:
         print("Invalid data type. Choose either 'text' or 'audio.'")
 
+    logging.info(f"Model manager stats: {model_manager.stats()}")
+
 
 if __name__ == "__main__":
     main()
@@ -10,12 +10,10 @@ from pydub import AudioSegment
 
 class GoogleASRModel:
     def __init__(self):
-
-        pass
+        self.client = speech.SpeechClient()
 
     def process_audio_file(self, audio_file_path):
         try:
-            client = speech.SpeechClient()
             first_lang = "en"  # -IN
             second_lang = "hi"
 
@@ -35,7 +33,7 @@ class GoogleASRModel:
                 alternative_language_codes=[second_lang],
             )
 
-            response = client.recognize(config=config, audio=audio)
+            response = self.client.recognize(config=config, audio=audio)
 
             if response.results:
                 detected_text = response.results[0].alternatives[0].transcript
@@ -5,12 +5,12 @@ class OpenaiWhisperModelOnline:
     def __init__(self, api_key):
         self.api_key = api_key
         self.organization = "REPLCE WITH YOUR ORG_ID"
+        self.client = OpenAI(api_key=self.api_key)
 
     def process_audio_file(self, audio_file_path):
         try:
             with open(audio_file_path, "rb") as audio_file:
-                client = OpenAI(api_key=self.api_key)
-                transcript = client.audio.transcriptions.create(
+                transcript = self.client.audio.transcriptions.create(
                     model="whisper-1",
                     file=audio_file,
                 )
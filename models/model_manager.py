@@ -0,0 +1,249 @@
+import gc
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from os.path import join, dirname, abspath
+
+DEFAULT_MEMORY_BUDGET_MB = 16384
+CONFIG_FILE = "config.json"
+
+
+class ModelManagerError(Exception):
+    pass
+
+
+def _load_config() -> dict:
+    config_path = join(dirname(dirname(abspath(__file__))), "config", CONFIG_FILE)
+    try:
+        with open(config_path, "r", encoding="utf-8") as file:
+            return json.load(file).get("model_manager", {})
+    except FileNotFoundError:
+        return {}
+    except json.JSONDecodeError as e:
+        logging.error("Error decoding JSON in config file: %s", e)
+        return {}
+
+
+def _measure_mb(instance) -> float:
+    """Return the parameter size of a wrapped torch model, or 0 if unknown."""
+    model = getattr(instance, "model", None)
+    parameters = getattr(model, "parameters", None)
+    if not callable(parameters):
+        return 0
+    try:
+        total = sum(p.numel() * p.element_size() for p in parameters())
+    except Exception:
+        return 0
+    return total / (1024 * 1024)
+
+
+class _ModelEntry:
+    def __init__(self, factory, estimated_mb):
+        self.factory = factory
+        self.estimated_mb = estimated_mb
+        self.resident_mb = 0
+        self.instance = None
+        self.users = 0
+        self.load_lock = threading.Lock()
+        self.loads = 0
+        self.evictions = 0
+        self.load_seconds = 0.0
+
+
+class ModelManager:
+    """Lazily load model backends and keep them resident within a budget.
+
+    Backends are registered by name with a factory and an estimated
+    resident size in MB. ``use`` loads a backend on first use and yields
+    the same instance to every caller and thread afterwards; while a
+    caller is inside ``use`` the backend is pinned and never evicted.
+    Loads in progress reserve their estimate, and when a load would
+    exceed ``memory_budget_mb`` the least recently used idle backends are
+    evicted first, or the load waits for in-flight loads and in-use
+    backends to finish. Torch-backed models report their real parameter
+    size once loaded, which replaces the estimate.
+
+    A caller must not ``use`` a second backend while holding one, since
+    the nested load may wait on the backend the caller itself pins.
+    """
+
+    def __init__(self, memory_budget_mb=DEFAULT_MEMORY_BUDGET_MB):
+        self.memory_budget_mb = memory_budget_mb
+        self.logger = logging.getLogger(__name__)
+        self._entries = {}
+        self._resident = OrderedDict()
+        self._pending_mb = 0
+        self._lock = threading.RLock()
+        self._state_changed = threading.Condition(self._lock)
+
+    @classmethod
+    def from_config(cls):
+        config = _load_config()
+        return cls(config.get("memory_budget_mb", DEFAULT_MEMORY_BUDGET_MB))
+
+    def register(self, name, factory, estimated_mb):
+        with self._lock:
+            if name in self._entries:
+                raise ModelManagerError(f"Model '{name}' is already registered.")
+            self._entries[name] = _ModelEntry(factory, estimated_mb)
+
+    @contextmanager
+    def use(self, name):
+        entry = self._entry(name)
+        instance = self._acquire(name, entry)
+        try:
+            yield instance
+        finally:
+            with self._lock:
+                entry.users -= 1
+                self._state_changed.notify_all()
+
+    def get(self, name):
+        """Load ``name`` if needed and return it without pinning it.
+
+        Use this to warm a backend up front; run inference inside ``use``
+        so the backend cannot be evicted mid-call.
+        """
+        with self.use(name) as instance:
+            return instance
+
+    def _acquire(self, name, entry):
+        with self._lock:
+            if entry.instance is not None:
+                return self._pin(name, entry)
+
+        # Loads can take minutes; hold only this model's lock so other
+        # resident models stay available to other threads meanwhile.
+        with entry.load_lock:
+            with self._lock:
+                if entry.instance is not None:
+                    return self._pin(name, entry)
+                evicted = self._make_room(name, entry.estimated_mb, wait=True)
+                self._pending_mb += entry.estimated_mb
+            if evicted:
+                gc.collect()
+
+            start_time = time.time()
+            try:
+                instance = entry.factory()
+            except Exception:
+                with self._lock:
+                    self._pending_mb -= entry.estimated_mb
+                    self._state_changed.notify_all()
+                raise
+            elapsed_time = time.time() - start_time
+
+            with self._lock:
+                self._pending_mb -= entry.estimated_mb
+                entry.instance = instance
+                entry.resident_mb = _measure_mb(instance) or entry.estimated_mb
+                entry.loads += 1
+                entry.load_seconds += elapsed_time
+                self._resident[name] = entry
+                self.logger.info(
+                    "Loaded model '%s' in %.2f seconds (%.0f MB resident).",
+                    name,
+                    elapsed_time,
+                    entry.resident_mb,
+                )
+                # Pin before anyone else can see it so waiting loads
+                # cannot evict it before the caller gets to use it.
+                self._pin(name, entry)
+                evicted = self._make_room(name, 0)
+                self._state_changed.notify_all()
+            if evicted:
+                gc.collect()
+            return instance
+
+    def evict(self, name):
+        with self._lock:
+            entry = self._resident.get(name)
+            if entry is None or entry.users:
+                return False
+            self._evict_locked(name)
+        gc.collect()
+        return True
+
+    def resident_mb(self):
+        with self._lock:
+            return sum(entry.resident_mb for entry in self._resident.values())
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "memory_budget_mb": self.memory_budget_mb,
+                "resident_mb": self.resident_mb(),
+                "pending_mb": self._pending_mb,
+                "models": {
+                    name: {
+                        "resident": entry.instance is not None,
+                        "resident_mb": entry.resident_mb,
+                        "users": entry.users,
+                        "loads": entry.loads,
+                        "evictions": entry.evictions,
+                        "load_seconds": round(entry.load_seconds, 2),
+                    }
+                    for name, entry in self._entries.items()
+                },
+            }
+
+    def _entry(self, name):
+        with self._lock:
+            entry = self._entries.get(name)
+        if entry is None:
+            raise ModelManagerError(f"Model '{name}' is not registered.")
+        return entry
+
+    def _pin(self, name, entry):
+        # Caller holds self._lock.
+        entry.users += 1
+        self._resident.move_to_end(name)
+        return entry.instance
+
+    def _evict_locked(self, name):
+        # Caller holds self._lock and runs gc.collect() after releasing it.
+        entry = self._resident.pop(name)
+        entry.instance = None
+        entry.resident_mb = 0
+        entry.evictions += 1
+        self.logger.info("Evicted model '%s'.", name)
+
+    def _make_room(self, name, incoming_mb, wait=False):
+        # Caller holds self._lock. Evicts idle LRU models other than
+        # `name` until resident, pending and `incoming_mb` fit the budget.
+        # With `wait`, blocks on in-flight loads and in-use models when
+        # nothing idle is left to evict. Returns whether anything was
+        # evicted.
+        evicted = False
+        while (
+            self.resident_mb() + self._pending_mb + incoming_mb
+            > self.memory_budget_mb
+        ):
+            victim = next(
+                (
+                    n
+                    for n, entry in self._resident.items()
+                    if n != name and not entry.users
+                ),
+                None,
+            )
+            busy = self._pending_mb or any(
+                entry.users for n, entry in self._resident.items() if n != name
+            )
+            if victim is not None:
+                self._evict_locked(victim)
+                evicted = True
+            elif wait and busy:
+                self._state_changed.wait()
+            else:
+                if incoming_mb:
+                    self.logger.warning(
+                        "Model '%s' alone exceeds the memory budget of %s MB.",
+                        name,
+                        self.memory_budget_mb,
+                    )
+                return evicted
+        return evicted
@@ -0,0 +1,123 @@
+import threading
+import time
+
+from models.model_manager import ModelManager
+
+
+class FakeModel:
+    """Stand-in backend that tracks how much fake memory is alive."""
+
+    lock = threading.Lock()
+    live_mb = 0
+    peak_mb = 0
+
+    def __init__(self, size_mb, load_seconds=0.05):
+        time.sleep(load_seconds)
+        self.size_mb = size_mb
+        with FakeModel.lock:
+            FakeModel.live_mb += size_mb
+            FakeModel.peak_mb = max(FakeModel.peak_mb, FakeModel.live_mb)
+
+    def __del__(self):
+        with FakeModel.lock:
+            FakeModel.live_mb -= self.size_mb
+
+    @classmethod
+    def reset(cls):
+        cls.live_mb = 0
+        cls.peak_mb = 0
+
+
+def test_concurrent_gets_share_one_instance():
+    FakeModel.reset()
+    manager = ModelManager(memory_budget_mb=100)
+    manager.register("a", lambda: FakeModel(60), 60)
+
+    instances = []
+    threads = [
+        threading.Thread(target=lambda: instances.append(manager.get("a")))
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len({id(instance) for instance in instances}) == 1
+    assert manager.stats()["models"]["a"]["loads"] == 1
+
+
+def test_concurrent_loads_stay_within_budget():
+    FakeModel.reset()
+    manager = ModelManager(memory_budget_mb=100)
+    manager.register("a", lambda: FakeModel(60, load_seconds=0.2), 60)
+    manager.register("b", lambda: FakeModel(60, load_seconds=0.2), 60)
+
+    threads = [
+        threading.Thread(target=manager.get, args=(name,)) for name in "ab"
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert FakeModel.peak_mb <= 100
+    assert manager.stats()["pending_mb"] == 0
+
+
+def test_in_use_model_is_not_evicted_until_released():
+    FakeModel.reset()
+    manager = ModelManager(memory_budget_mb=100)
+    manager.register("a", lambda: FakeModel(60), 60)
+    manager.register("b", lambda: FakeModel(60), 60)
+
+    a_in_use = threading.Event()
+    release_a = threading.Event()
+    b_loaded = threading.Event()
+
+    def use_a():
+        with manager.use("a"):
+            a_in_use.set()
+            release_a.wait()
+
+    def use_b():
+        with manager.use("b"):
+            b_loaded.set()
+
+    thread_a = threading.Thread(target=use_a)
+    thread_a.start()
+    a_in_use.wait()
+    thread_b = threading.Thread(target=use_b)
+    thread_b.start()
+
+    # b must wait for a to be released rather than evict it mid-use.
+    assert not b_loaded.wait(0.3)
+    stats = manager.stats()["models"]
+    assert stats["a"]["resident"] and stats["a"]["users"] == 1
+    assert stats["a"]["evictions"] == 0
+
+    release_a.set()
+    thread_a.join()
+    thread_b.join()
+
+    assert b_loaded.is_set()
+    assert FakeModel.peak_mb <= 100
+    stats = manager.stats()
+    assert stats["models"]["a"]["evictions"] == 1
+    assert stats["models"]["a"]["loads"] == 1
+    assert stats["resident_mb"] == 60
+
+
+def test_failed_load_releases_reservation():
+    manager = ModelManager(memory_budget_mb=100)
+
+    def broken():
+        raise RuntimeError("load failed")
+
+    manager.register("broken", broken, 50)
+    try:
+        manager.get("broken")
+    except RuntimeError:
+        pass
+
+    assert manager.stats()["pending_mb"] == 0
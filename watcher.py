@@ -0,0 +1,290 @@
+import hashlib
+import json
+import logging
+import os
+import time
+from datetime import datetime
+
+DEFAULT_POLL_INTERVAL_SECONDS = 10
+DEFAULT_SETTLE_SECONDS = 2
+MANIFEST_FILE = ".versavox_manifest.json"
+RESULTS_FILE = "versavox_results.jsonl"
+HASH_CHUNK_SIZE = 1024 * 1024
+MAX_ATTEMPTS = 5
+RETRY_BACKOFF_SECONDS = 60
+
+
+class FileProcessingError(Exception):
+    """Raised by ``process_file`` when some or all of a file failed.
+
+    ``results`` holds whatever succeeded and is appended right away;
+    ``retry_state`` is stored in the manifest and passed back to
+    ``process_file`` on the next attempt so only the failed part is redone.
+    """
+
+    def __init__(self, message, results=None, retry_state=None):
+        super().__init__(message)
+        self.results = results or []
+        self.retry_state = retry_state
+
+
+def file_sha256(file_path):
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as file:
+        for chunk in iter(lambda: file.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ProcessedFileManifest:
+    """Record of files already seen, keyed by absolute path.
+
+    Each entry stores the size, mtime and sha256 seen when the file was
+    processed, plus its status. Failed files keep an attempt count, the
+    time of the next retry, which backs off exponentially until
+    ``MAX_ATTEMPTS`` is reached, and any retry state from
+    ``process_file``. Changes are written atomically by ``save``; the
+    watcher saves after every processed file so results are never
+    appended twice after a crash.
+    """
+
+    def __init__(self, manifest_path):
+        self.manifest_path = manifest_path
+        self.entries = self._load()
+        self.dirty = False
+
+    def _load(self):
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as file:
+                return json.load(file)
+        except FileNotFoundError:
+            return {}
+        except json.JSONDecodeError as e:
+            logging.error(
+                f"Error decoding manifest {self.manifest_path}: {e}. Starting fresh."
+            )
+            return {}
+
+    def save(self):
+        if not self.dirty:
+            return
+        tmp_path = f"{self.manifest_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            json.dump(self.entries, file, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.manifest_path)
+        self.dirty = False
+
+    def is_unchanged(self, file_path, stat):
+        entry = self.entries.get(file_path)
+        return (
+            entry is not None
+            and entry["size"] == stat.st_size
+            and entry["mtime"] == stat.st_mtime
+        )
+
+    def has_hash(self, file_path, sha256):
+        entry = self.entries.get(file_path)
+        return entry is not None and entry["sha256"] == sha256
+
+    def is_retry_due(self, file_path, now):
+        entry = self.entries.get(file_path)
+        return (
+            entry is not None
+            and entry.get("status") == "failed"
+            and entry["attempts"] < MAX_ATTEMPTS
+            and now >= entry["next_attempt_at"]
+        )
+
+    def touch(self, file_path, stat):
+        entry = self.entries[file_path]
+        entry["size"] = stat.st_size
+        entry["mtime"] = stat.st_mtime
+        self.dirty = True
+
+    def record(self, file_path, stat, sha256):
+        self.entries[file_path] = {
+            "size": stat.st_size,
+            "mtime": stat.st_mtime,
+            "sha256": sha256,
+            "status": "done",
+            "processed_at": datetime.now().isoformat(),
+        }
+        self.dirty = True
+
+    def retry_state(self, file_path, sha256):
+        entry = self.entries.get(file_path)
+        if entry is None or entry.get("status") != "failed":
+            return None
+        if entry["sha256"] != sha256:
+            return None
+        return entry.get("retry_state")
+
+    def record_failure(
+        self, file_path, stat, sha256, error, now, retry_state=None
+    ):
+        entry = self.entries.get(file_path)
+        attempts = 1
+        if entry is not None and entry.get("status") == "failed":
+            if entry["sha256"] == sha256:
+                attempts = entry["attempts"] + 1
+        self.entries[file_path] = {
+            "size": stat.st_size,
+            "mtime": stat.st_mtime,
+            "sha256": sha256,
+            "status": "failed",
+            "error": error,
+            "attempts": attempts,
+            "retry_state": retry_state,
+            "next_attempt_at": now + RETRY_BACKOFF_SECONDS * 2 ** (attempts - 1),
+            "processed_at": datetime.now().isoformat(),
+        }
+        self.dirty = True
+        return attempts
+
+    def prune(self, file_paths):
+        for file_path in set(self.entries) - set(file_paths):
+            del self.entries[file_path]
+            self.dirty = True
+
+
+class FolderWatcher:
+    """Poll a file or directory and process only new or changed files.
+
+    ``process_file`` is called with the path of each delta and the retry
+    state of its previous failed attempt (``None`` on a first attempt),
+    and returns a list of result dicts, which are appended to
+    ``results_path`` as JSON lines as soon as the file is done. It raises
+    ``FileProcessingError`` (or any other exception) when detection
+    fails; partial results are appended, the file is retried with
+    backoff and, once ``MAX_ATTEMPTS`` is reached, an error record is
+    appended instead. Files modified within the last
+    ``settle_seconds`` are left for the next poll so half-copied
+    recordings are not picked up.
+    """
+
+    def __init__(
+        self,
+        data_path,
+        extensions,
+        process_file,
+        manifest_path=None,
+        results_path=None,
+        poll_interval=DEFAULT_POLL_INTERVAL_SECONDS,
+        settle_seconds=DEFAULT_SETTLE_SECONDS,
+    ):
+        self.data_path = os.path.abspath(data_path)
+        self.extensions = tuple(extensions)
+        self.process_file = process_file
+        base_dir = (
+            self.data_path
+            if os.path.isdir(self.data_path)
+            else os.path.dirname(self.data_path)
+        )
+        self.manifest = ProcessedFileManifest(
+            manifest_path or os.path.join(base_dir, MANIFEST_FILE)
+        )
+        self.results_path = results_path or os.path.join(base_dir, RESULTS_FILE)
+        self.poll_interval = poll_interval
+        self.settle_seconds = settle_seconds
+
+    def _candidate_files(self):
+        if os.path.isfile(self.data_path):
+            return [self.data_path]
+        with os.scandir(self.data_path) as entries:
+            return sorted(
+                entry.path
+                for entry in entries
+                if entry.is_file() and entry.name.endswith(self.extensions)
+            )
+
+    def _append_results(self, file_path, results):
+        with open(self.results_path, "a", encoding="utf-8") as file:
+            for result in results:
+                record = {"file": file_path, **result}
+                file.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    def _process_if_changed(self, file_path, now):
+        stat = os.stat(file_path)
+        if self.manifest.is_unchanged(file_path, stat):
+            if not self.manifest.is_retry_due(file_path, now):
+                return False
+            sha256 = self.manifest.entries[file_path]["sha256"]
+        else:
+            if now - stat.st_mtime < self.settle_seconds:
+                return False
+            sha256 = file_sha256(file_path)
+            if self.manifest.has_hash(file_path, sha256):
+                # Touched but not modified; refresh stat info only.
+                self.manifest.touch(file_path, stat)
+                if not self.manifest.is_retry_due(file_path, now):
+                    return False
+
+        retry_state = self.manifest.retry_state(file_path, sha256)
+        try:
+            results = self.process_file(file_path, retry_state) or []
+        except Exception as e:
+            if isinstance(e, FileProcessingError):
+                self._append_results(file_path, e.results)
+                retry_state = e.retry_state
+            attempts = self.manifest.record_failure(
+                file_path, stat, sha256, str(e), now, retry_state
+            )
+            self.manifest.save()
+            logging.error(
+                f"Error processing {file_path} in watch mode "
+                f"(attempt {attempts}/{MAX_ATTEMPTS}): {e}"
+            )
+            if attempts >= MAX_ATTEMPTS:
+                self._append_results(
+                    file_path, [{"error": str(e), "attempts": attempts}]
+                )
+            return False
+
+        self._append_results(file_path, results)
+        self.manifest.record(file_path, stat, sha256)
+        self.manifest.save()
+        return True
+
+    def scan_once(self):
+        processed = []
+        now = time.time()
+        try:
+            candidates = self._candidate_files()
+        except OSError as e:
+            logging.error(f"Error listing {self.data_path} in watch mode: {e}")
+            return processed
+
+        self.manifest.prune(candidates)
+        try:
+            for file_path in candidates:
+                try:
+                    if self._process_if_changed(file_path, now):
+                        processed.append(file_path)
+                except OSError as e:
+                    # Moved, deleted or unreadable mid-poll; the next scan
+                    # prunes or retries it.
+                    logging.error(f"Skipping {file_path} in watch mode: {e}")
+        finally:
+            try:
+                self.manifest.save()
+            except OSError as e:
+                logging.error(
+                    f"Error saving manifest {self.manifest.manifest_path}: {e}"
+                )
+        return processed
+
+    def run(self):
+        print(
+            f"Watching {self.data_path} every {self.poll_interval}s. "
+            f"Results: {self.results_path}"
+        )
+        try:
+            while True:
+                try:
+                    for file_path in self.scan_once():
+                        print(f"Processed: {file_path}")
+                except Exception as e:
+                    logging.error(f"Error during watch scan: {e}")
+                time.sleep(self.poll_interval)
+        except KeyboardInterrupt:
+            print("Watch mode stopped.")